@@ -2,19 +2,47 @@
 Log Analyzer - Processes and analyzes generated logs to extract insights.
 """
 import json
+import mmap
+import os
 import re
-from collections import defaultdict, deque
+import stat
+from collections import Counter, defaultdict, deque
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Any, Union
+from typing import BinaryIO, Dict, Iterator, List, Tuple, Optional, Any, Union
+
+import numpy as np
+
+try:
+    from orjson import loads as _json_loads
+except ImportError:  # orjson is optional; fall back to the stdlib parser
+    from json import loads as _json_loads
+
+# Example format: 2025-07-27T21:30:00.123456 [INFO] [SERVICE-ID] [service-name]: message
+_TEXT_RE: re.Pattern = re.compile(r'^(\S+) \[(\w+)\] \[([^\]]+)\] \[([^\]]+)\]: (.+)$')
+
+# Window sizes for scanning the log file: start small and double up to the cap
+_MIN_READ_CHUNK: int = 64 * 1024
+_MAX_READ_CHUNK: int = 16 * 1024 * 1024
+
+# Small-int codes for log levels; levels not listed here are interned as they appear
+LEVEL_CODES: Dict[str, int] = {'INFO': 0, 'WARNING': 1, 'ERROR': 2, 'DEBUG': 3}
+ERROR_CODE: int = LEVEL_CODES['ERROR']
+_NO_SERVICE: int = -1  # Service code for entries without a service field
+_INITIAL_CAPACITY: int = 4096
+
 
 class LogAnalyzer:
-    def __init__(self, log_file: str):
+    _TEXT_RE: re.Pattern = _TEXT_RE
+
+    def __init__(self, log_file: str, window_size: int = 5):
         """Initialize the log analyzer with a log file path."""
         self.log_file = Path(log_file)
         self.log_format = self._detect_log_format()
-        self.logs: List[Dict[str, Any]] = []
-        self._parse_logs()
+        if window_size < 1:
+            raise ValueError(f"window_size must be at least 1, got {window_size}")
+        self.window_size: int = window_size
+        self.analyze()
         
     def _detect_log_format(self) -> str:
         """Detect the format of the log file based on its extension."""
@@ -25,18 +53,24 @@ class LogAnalyzer:
             return 'csv'
         return 'txt'  # Default to text format
     
-    def _parse_json_log(self, line: str) -> Optional[Dict[str, Any]]:
+    def _parse_json_log(self, line: Union[str, bytes]) -> Optional[Dict[str, Any]]:
         """Parse a single line of JSON log."""
+        try:
+            return _json_loads(line)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            if _json_loads is json.loads:
+                return None
+        
+        # orjson is stricter than the stdlib parser (no NaN/Infinity, no integers
+        # wider than 64 bits), so give rejected lines a second chance there
         try:
             return json.loads(line)
-        except json.JSONDecodeError:
+        except (json.JSONDecodeError, UnicodeDecodeError):
             return None
     
     def _parse_text_log(self, line: str) -> Optional[Dict[str, Any]]:
         """Parse a single line of text log."""
-        # Example format: 2025-07-27T21:30:00.123456 [INFO] [SERVICE-ID] [service-name]: message
-        pattern: str = r'^(\S+) \[(\w+)\] \[([^\]]+)\] \[([^\]]+)\]: (.+)$'
-        match: Optional[Match[str]] = re.match(pattern, line)
+        match: Optional[re.Match] = _TEXT_RE.match(line)
         if not match:
             return None
             
@@ -56,69 +90,202 @@ class LogAnalyzer:
             return self._parse_text_log(line[1:-1])
         return None
     
-    def _parse_logs(self) -> None:
-        """Parse all logs in the file based on detected format."""
+    def _iter_lines(self) -> Iterator[bytes]:
+        """Yield raw lines from the log file.
+        
+        Regular files are scanned through a read-only memory map. Pipes, FIFOs
+        and files like those under /proc report a size of 0, so they are read
+        sequentially instead.
+        """
+        with open(self.log_file, 'rb', buffering=0) as f:
+            st: os.stat_result = os.fstat(f.fileno())
+            if stat.S_ISREG(st.st_mode) and st.st_size:
+                yield from self._iter_mapped_lines(f, st.st_size)
+            else:
+                yield from self._iter_read_lines(f)
+    
+    def _iter_mapped_lines(self, f: BinaryIO, size: int) -> Iterator[bytes]:
+        """Yield raw lines from a regular file through a read-only memory map.
+        
+        The map is consumed in windows that start at 64 KiB and double up to
+        16 MiB. Each window ends on a line break, so it is split in C by
+        bytes.splitlines() without carrying partial lines between windows.
+        The file size is checked again before each window, so a file truncated
+        while it is read (e.g. by log rotation) ends the scan early instead of
+        touching pages that no longer exist.
+        """
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mmap, 'MADV_SEQUENTIAL'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+            
+            start: int = 0
+            window: int = _MIN_READ_CHUNK
+            while start < size:
+                size = min(size, os.fstat(f.fileno()).st_size)
+                end: int = start + window
+                if end < size:
+                    cut: int = mm.rfind(b'\n', start, end)
+                    if cut < 0:
+                        # A single line longer than the window
+                        cut = mm.find(b'\n', end, size)
+                    end = size if cut < 0 else cut + 1
+                else:
+                    end = size
+                
+                yield from mm[start:end].splitlines()
+                start = end
+                window = min(window * 2, _MAX_READ_CHUNK)
+    
+    def _iter_read_lines(self, f: BinaryIO) -> Iterator[bytes]:
+        """Yield raw lines from any readable file using large sequential reads.
+        
+        Reads start at 64 KiB and double up to 16 MiB, carrying a trailing
+        partial line over to the next read.
+        """
+        chunk_size: int = _MIN_READ_CHUNK
+        tail: bytes = b''
+        while True:
+            chunk: bytes = f.read(chunk_size)
+            if not chunk:
+                break
+            lines: List[bytes] = (tail + chunk).splitlines()
+            tail = b'' if chunk[-1:] in (b'\n', b'\r') else lines.pop()
+            yield from lines
+            chunk_size = min(chunk_size * 2, _MAX_READ_CHUNK)
+        
+        if tail:
+            yield tail
+    
+    def _iter_logs(self) -> Iterator[Dict[str, Any]]:
+        """Lazily yield parsed log entries from the file based on detected format."""
         if not self.log_file.exists():
             raise FileNotFoundError(f"Log file not found: {self.log_file}")
         
-        with open(self.log_file, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
+        for raw_line in self._iter_lines():
+            # JSON is parsed straight from bytes, where JSON's own whitespace is all
+            # ASCII. The other formats are stripped after decoding so that Unicode
+            # whitespace goes too, as it did when the file was read as text.
+            log_entry = None
+            if self.log_format == 'json':
+                raw_line = raw_line.strip()
+                if not raw_line:
+                    continue
+                log_entry = self._parse_json_log(raw_line)
+            else:
+                line: str = raw_line.decode('utf-8', 'replace').strip()
                 if not line:
                     continue
-                    
-                log_entry = None
-                if self.log_format == 'json':
-                    log_entry = self._parse_json_log(line)
-                elif self.log_format == 'csv':
+                if self.log_format == 'csv':
                     log_entry = self._parse_csv_log(line)
                 else:  # txt format
                     log_entry = self._parse_text_log(line)
-                
-                if log_entry:
-                    self.logs.append(log_entry)
+            
+            if log_entry:
+                yield log_entry
+    
+    def analyze(self) -> None:
+        """Parse the log file once into compact per-field columns.
+        
+        Levels and services are interned to small-int codes and stored in NumPy
+        arrays, one slot per log. Timestamps and messages are only kept for
+        errors, which are the only entries the reports need them for.
+        """
+        level_ids: Dict[str, int] = dict(LEVEL_CODES)
+        service_ids: Dict[str, int] = {}
+        levels: np.ndarray = np.empty(_INITIAL_CAPACITY, dtype=np.int8)
+        services: np.ndarray = np.empty(_INITIAL_CAPACITY, dtype=np.int16)
+        error_timestamps: List[str] = []
+        error_messages: List[str] = []
+        service_durations: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0])
+        total: int = 0
+        
+        for log in self._iter_logs():
+            if total == len(levels):
+                levels = np.concatenate((levels, np.empty_like(levels)))
+                services = np.concatenate((services, np.empty_like(services)))
+            
+            level = log.get('level', 'UNKNOWN')
+            level_code = level_ids.get(level)
+            if level_code is None:
+                level_code = level_ids[level] = len(level_ids)
+                if level_code > np.iinfo(levels.dtype).max:
+                    levels = levels.astype(np.int16)
+            levels[total] = level_code
+            
+            service_code: int = _NO_SERVICE
+            if 'service' in log:
+                service_code = service_ids.get(log['service'])
+                if service_code is None:
+                    service_code = service_ids[log['service']] = len(service_ids)
+                    if service_code > np.iinfo(services.dtype).max:
+                        services = services.astype(np.int32)
+            services[total] = service_code
+            total += 1
+            
+            # This is a simplified example - in a real system, you'd parse actual durations from logs
+            if 'duration' in log:
+                stats = service_durations[log.get('service', 'unknown')]
+                stats[0] += 1
+                stats[1] += log['duration']
+            
+            if level_code == ERROR_CODE:
+                error_timestamps.append(log.get('timestamp'))
+                error_messages.append(log.get('message'))
+        
+        self.total_logs: int = total
+        self._level_ids = level_ids
+        self._service_names: List[str] = list(service_ids)
+        self._levels = levels[:total]
+        self._services = services[:total]
+        self._error_timestamps = error_timestamps
+        self._error_messages = error_messages
+        self._service_durations = service_durations
+    
+    @property
+    def unique_services(self) -> int:
+        """Number of distinct services seen in the logs."""
+        return len(self._service_names)
     
     def get_log_count_by_type(self) -> Dict[str, int]:
         """Count logs by log level (INFO, WARNING, ERROR, DEBUG)."""
-        counts: Dict[str, int] = defaultdict(int)
-        for log in self.logs:
-            counts[log.get('level', 'UNKNOWN')] += 1
-        return dict(counts)
+        counts: np.ndarray = np.bincount(self._levels, minlength=len(self._level_ids))
+        return {level: int(counts[code]) for level, code in self._level_ids.items() if counts[code]}
     
     def get_average_duration_by_service(self) -> Dict[str, float]:
         """Calculate average duration of operations by service (simplified example)."""
-        service_times: Dict[str, List[float]] = defaultdict(list)
-        
-        # This is a simplified example - in a real system, you'd parse actual durations from logs
-        for log in self.logs:
-            if 'duration' in log:
-                service_times[log.get('service', 'unknown')].append(log['duration'])
-            
         return {
-            service: sum(times) / len(times)
-            for service, times in service_times.items()
-            if times
+            service: total / count
+            for service, (count, total) in self._service_durations.items()
+            if count
         }
     
     def detect_error_sequences(self, window_size: int = 5) -> List[Dict[str, Any]]:
         """Detect sequences of errors that might indicate a problem."""
+        if window_size < 1:
+            raise ValueError(f"window_size must be at least 1, got {window_size}")
         error_sequences: List[Dict[str, Any]] = []
-        current_sequence: List[Dict[str, Any]] = []
-        
-        for log in self.logs:
-            if log.get('level') == 'ERROR':
-                current_sequence.append(log)
-                if len(current_sequence) >= window_size:
-                    error_sequences.append({
-                        'start_time': current_sequence[0]['timestamp'],
-                        'end_time': current_sequence[-1]['timestamp'],
-                        'count': len(current_sequence),
-                        'service': current_sequence[0].get('service', 'unknown'),
-                        'sample_messages': [log['message'] for log in current_sequence[:3]]  # First 3 messages
-                    })
-                    current_sequence = []
-            else:
-                current_sequence = []
+        
+        # Run boundaries: +1 where a run of errors starts, -1 just past where it ends
+        is_error: np.ndarray = self._levels == ERROR_CODE
+        edges: np.ndarray = np.diff(is_error.astype(np.int8), prepend=0, append=0)
+        starts: np.ndarray = np.flatnonzero(edges == 1)
+        ends: np.ndarray = np.flatnonzero(edges == -1)
+        lengths: np.ndarray = ends - starts
+        # Where each run begins within the error-only timestamp/message columns
+        offsets: np.ndarray = np.cumsum(lengths) - lengths
+        
+        mask: np.ndarray = lengths >= window_size
+        for start, offset, length in zip(starts[mask].tolist(), offsets[mask].tolist(), lengths[mask].tolist()):
+            for step in range(0, length - window_size + 1, window_size):
+                first: int = offset + step
+                service_code: int = int(self._services[start + step])
+                error_sequences.append({
+                    'start_time': self._error_timestamps[first],
+                    'end_time': self._error_timestamps[first + window_size - 1],
+                    'count': window_size,
+                    'service': self._service_names[service_code] if service_code != _NO_SERVICE else 'unknown',
+                    'sample_messages': self._error_messages[first:first + min(3, window_size)]  # First 3 messages
+                })
                 
         return error_sequences
     
@@ -127,10 +294,7 @@ class LogAnalyzer:
         unusual: List[Dict[str, Any]] = []
         
         # Example: Look for repeated error messages
-        error_messages: Dict[str, int] = defaultdict(int)
-        for log in self.logs:
-            if log.get('level') == 'ERROR':
-                error_messages[log.get('message')] += 1
+        error_messages: Counter = Counter(self._error_messages)
         
         # Consider any error that occurs more than 5 times as unusual
         for msg, count in error_messages.items():
@@ -148,12 +312,12 @@ class LogAnalyzer:
         """Generate a comprehensive report of log analysis."""
         return {
             'summary': {
-                'total_logs': len(self.logs),
+                'total_logs': self.total_logs,
                 'log_levels': self.get_log_count_by_type(),
-                'unique_services': len({log.get('service') for log in self.logs if 'service' in log})
+                'unique_services': self.unique_services
             },
             'error_analysis': {
-                'error_sequences': self.detect_error_sequences(),
+                'error_sequences': self.detect_error_sequences(self.window_size),
                 'unusual_patterns': self.detect_unusual_patterns()
             },
             'service_metrics': {
@@ -0,0 +1,94 @@
+"""
+Tests for the log analyzer's error-sequence detection.
+"""
+import json
+import random
+from typing import Any, Dict, List
+
+import pytest
+
+from log_analyzer import LogAnalyzer
+
+LEVELS: List[str] = ['INFO', 'WARNING', 'ERROR', 'DEBUG', 'TRACE']
+SERVICES: List[str] = ['user-service', 'payment-service', 'auth-service']
+
+
+def reference_error_sequences(logs: List[Dict[str, Any]], window_size: int) -> List[Dict[str, Any]]:
+    """The original list-based scan, kept as the oracle for the vectorized version."""
+    error_sequences: List[Dict[str, Any]] = []
+    current_sequence: List[Dict[str, Any]] = []
+
+    for log in logs:
+        if log.get('level') == 'ERROR':
+            current_sequence.append(log)
+            if len(current_sequence) >= window_size:
+                error_sequences.append({
+                    'start_time': current_sequence[0]['timestamp'],
+                    'end_time': current_sequence[-1]['timestamp'],
+                    'count': len(current_sequence),
+                    'service': current_sequence[0].get('service', 'unknown'),
+                    'sample_messages': [log['message'] for log in current_sequence[:3]]
+                })
+                current_sequence = []
+        else:
+            current_sequence = []
+
+    return error_sequences
+
+
+def random_logs(seed: int) -> List[Dict[str, Any]]:
+    """Build a log with runs of errors of varied lengths, some entries lacking a service."""
+    rng = random.Random(seed)
+    logs: List[Dict[str, Any]] = []
+    for i in range(rng.randint(0, 300)):
+        # Errors come in runs often enough to produce long sequences
+        error_bias = 0.8 if logs and logs[-1]['level'] == 'ERROR' else 0.2
+        level = 'ERROR' if rng.random() < error_bias else rng.choice(LEVELS)
+        log: Dict[str, Any] = {
+            'timestamp': f"2025-07-27T19:50:{i // 1000:02d}.{i % 1000:06d}",
+            'level': level,
+            'message': f"message {rng.randint(0, 5)}"
+        }
+        if rng.random() < 0.9:
+            log['service'] = rng.choice(SERVICES)
+        logs.append(log)
+    return logs
+
+
+@pytest.mark.parametrize('window_size', range(1, 8))
+def test_error_sequences_match_reference(tmp_path, window_size: int) -> None:
+    for seed in range(60):
+        logs = random_logs(seed)
+        log_file = tmp_path / f"logs-{seed}.json"
+        log_file.write_text(''.join(json.dumps(log) + '\n' for log in logs))
+
+        analyzer = LogAnalyzer(str(log_file), window_size=window_size)
+        assert analyzer.detect_error_sequences(window_size) == reference_error_sequences(logs, window_size)
+
+
+def test_error_sequences_split_long_runs(tmp_path) -> None:
+    # A run of 7 errors holds two full windows of 3; the leftover error is dropped
+    log_file = tmp_path / "logs.log.txt"
+    log_file.write_text(
+        "t0 [INFO] [ID-0] [svc-a]: ok\n"
+        + ''.join(f"t{i} [ERROR] [ID-{i}] [svc-{i}]: boom {i}\n" for i in range(1, 8))
+        + "t8 [INFO] [ID-8] [svc-a]: ok\n"
+    )
+
+    sequences = LogAnalyzer(str(log_file)).detect_error_sequences(3)
+    assert [(s['start_time'], s['end_time'], s['service']) for s in sequences] == [
+        ('t1', 't3', 'svc-1'),
+        ('t4', 't6', 'svc-4'),
+    ]
+    assert sequences[1]['sample_messages'] == ['boom 4', 'boom 5', 'boom 6']
+
+
+@pytest.mark.parametrize('window_size', [0, -1])
+def test_window_size_must_be_positive(tmp_path, window_size: int) -> None:
+    log_file = tmp_path / "logs.log.txt"
+    log_file.write_text("t0 [ERROR] [ID-0] [svc-a]: boom\n")
+
+    with pytest.raises(ValueError):
+        LogAnalyzer(str(log_file), window_size=window_size)
+    with pytest.raises(ValueError):
+        LogAnalyzer(str(log_file)).detect_error_sequences(window_size)
@@ -2,9 +2,113 @@
 Log generator module for creating sample logs with configurable rates and types.
 """
 import os
+import sys
+import atexit
 import time
+import queue
 import random
-from datetime import datetime
+import string
+import functools
+import threading
+
+import numpy as np
+
+try:
+    from orjson import dumps as _json_dumps
+except ImportError:  # orjson is optional; fall back to the stdlib encoder
+    import json
+
+    def _json_dumps(obj: dict) -> bytes:
+        # Same bytes as orjson: compact separators, non-ASCII left unescaped
+        return json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode()
+
+# Most queued entries the background writer gathers into a single writev call.
+# An entry is at most 2 buffers, which keeps a full batch well under IOV_MAX (1024).
+WRITE_BATCH_SIZE: int = 64
+# Most entries waiting for the writer; write_log blocks beyond this, so a slow
+# disk throttles the generator instead of growing memory
+WRITE_QUEUE_SIZE: int = 4096
+
+_NL: bytes = b'\n'
+# Number of log types / services drawn per refill of the sampling buffers
+SAMPLE_BATCH_SIZE: int = 4096
+
+# Generators for the context fields a message template can refer to, keyed by field name
+BASE_CONTEXT: dict = {
+    'timestamp': lambda: int(time.time()),
+    'request_id': lambda: f"req-{random.randint(1000, 9999)}",
+    'user_id': lambda: f"user-{random.randint(1, 1000)}",
+    'ip_address': lambda: f"192.168.{random.randint(0, 255)}.{random.randint(0, 255)}"
+}
+AUTH_CONTEXT: dict = {
+    'provider': lambda: random.choice(['google', 'github', 'email', 'microsoft']),
+    'session_id': lambda: f"sess-{random.getrandbits(64):016x}"
+}
+PAYMENT_CONTEXT: dict = {
+    'amount': lambda: f"{random.uniform(10, 1000):.2f}",
+    'currency': lambda: random.choice(['USD', 'EUR', 'GBP']),
+    'transaction_id': lambda: f"txn-{random.getrandbits(64):016x}"
+}
+
+# Last-resort message templates when neither the service nor 'default' defines one
+DEFAULT_MESSAGES: dict = {
+    "INFO": "Operation completed successfully in {service}",
+    "WARNING": "Warning in {service}: Potential issue detected",
+    "ERROR": "Error in {service}: Operation failed",
+    "DEBUG": "Debug info from {service}: Processing data"
+}
+
+def _template_fields(template: str) -> frozenset:
+    """Return the names of the context fields a str.format template refers to."""
+    fields: set = set()
+    try:
+        for _, field_name, format_spec, _ in string.Formatter().parse(template):
+            if field_name:
+                # Only the leading name is looked up in the context ("a.b" / "a[0]" -> "a")
+                fields.add(field_name.partition('.')[0].partition('[')[0])
+            if format_spec and '{' in format_spec:
+                fields |= _template_fields(format_spec)
+    except ValueError:
+        pass  # Malformed template; str.format will report it when used
+    return frozenset(fields)
+
+def _compile_template(template: str):
+    """Compile a str.format template into an equivalent function of the context dict.
+    
+    The template is parsed once and rewritten as an f-string, so formatting a
+    message no longer re-parses it. Templates using anything the rewrite doesn't
+    cover (positional, attribute or index fields, nested or quoted format specs)
+    keep going through str.format.
+    """
+    def format_with_template(context: dict) -> str:
+        return template.format(**context)
+    
+    try:
+        parsed = list(string.Formatter().parse(template))
+    except ValueError:
+        return format_with_template  # Malformed; str.format raises as it always did
+    
+    body: list = []
+    for literal, field_name, format_spec, conversion in parsed:
+        body.append(literal.replace('{', '{{').replace('}', '}}'))
+        if field_name is None:
+            continue
+        if (not field_name.isidentifier() or conversion not in (None, 'r', 's', 'a')
+                or any(c in format_spec for c in '{}\'"')):
+            return format_with_template
+        body.append("{context[%r]%s%s}" % (field_name,
+                                           '!' + conversion if conversion else '',
+                                           ':' + format_spec if format_spec else ''))
+    
+    source: str = ''.join(body)
+    if '\\' in source or '"' in source or not source.isprintable():
+        return format_with_template
+    return eval(compile(f'lambda context: f"""{source}"""', '<message template>', 'eval'), {'__builtins__': {}})
+
+@functools.lru_cache(maxsize=None)
+def _prepare_template(template: str) -> tuple:
+    """Return (template, context fields it needs, compiled formatter), built once per template."""
+    return template, _template_fields(template), _compile_template(template)
 
 class LogGenerator:
     def __init__(self, config: dict):
@@ -12,163 +116,291 @@ class LogGenerator:
         self.config: dict = config
         self.ensure_log_directory()
         
+        # Output files are opened once and kept open; keyed by resolved path
+        self._outputs: dict = {}
+        # Formatted entries are handed to a background writer thread as (fd, [bytes, ...])
+        self._write_queue: queue.Queue = queue.Queue(maxsize=WRITE_QUEUE_SIZE)
+        self._writer: threading.Thread | None = None
+        
+        # Log types and services are sampled in batches and handed out one by one
+        distribution: dict = self.config["LOG_DISTRIBUTION"]
+        self._rng: np.random.Generator = np.random.default_rng()
+        self._lvl_names: np.ndarray = np.array(list(distribution.keys()), dtype=object)
+        self._lvl_cum: np.ndarray = np.cumsum(list(distribution.values()), dtype=np.float64)
+        self._lvl_cum /= self._lvl_cum[-1]
+        self._lvl_buf: list = []
+        self._lvl_idx: int = 0
+        self._svc_names: np.ndarray = np.array(self.config["SERVICES"], dtype=object)
+        self._svc_buf: list = []
+        self._svc_idx: int = 0
+        # Second the cached timestamp prefix belongs to; see _timestamp()
+        self._ts_sec_cached: int = -1
+        self._ts_prefix: str = ""
+        
+        # Burst thresholds only depend on configuration, so work them out once
+        if self.config["ENABLE_BURSTS"]:
+            self._burst_window_s: float = self.config["BURST_FREQUENCY"] * 60  # Convert minutes to seconds
+            self._burst_prob: float = 1.0 / self._burst_window_s
+        
+        # Candidate message templates per (service, log type), each paired with the
+        # context fields it needs (so only those get generated) and a compiled formatter
+        self._msg_table: dict = {
+            (service, log_type): self._resolve_messages(service, log_type)
+            for service in self.config["SERVICES"]
+            for log_type in distribution
+        }
+        
     def ensure_log_directory(self) -> None:
         """Make sure the log directory exists."""
         log_dir: str = os.path.dirname(self.config["OUTPUT_FILE"])
         if log_dir and not os.path.exists(log_dir):
             os.makedirs(log_dir, exist_ok=True)
     
-    def _get_service_message(self, service: str, log_type: str) -> str:
-        """Get a message template for the given service and log type."""
+    def _get_service_message(self, service: str, log_type: str) -> tuple:
+        """Get a message template for the given service and log type.
+        
+        Returns:
+            The template, the set of context fields it refers to, and its compiled formatter
+        """
+        messages = self._msg_table.get((service, log_type))
+        if messages is None:
+            messages = self._msg_table[(service, log_type)] = self._resolve_messages(service, log_type)
+        return messages[random.randrange(len(messages))]
+    
+    def _resolve_messages(self, service: str, log_type: str) -> tuple:
+        """Collect the prepared template candidates for the given service and log type."""
         # Try to get service-specific message first
         service_messages = self.config.get('SERVICE_MESSAGES', {})
-        
-        if service in service_messages and log_type in service_messages[service]:
-            return random.choice(service_messages[service][log_type])
+        templates = service_messages.get(service, {}).get(log_type)
         
         # Fall back to default messages if service-specific not found
-        if 'default' in service_messages and log_type in service_messages['default']:
-            return random.choice(service_messages['default'][log_type])
+        if not templates:
+            templates = service_messages.get('default', {}).get(log_type)
         
         # Fall back to hardcoded defaults if nothing else is available
-        default_messages = {
-            "INFO": "Operation completed successfully in {service}",
-            "WARNING": "Warning in {service}: Potential issue detected",
-            "ERROR": "Error in {service}: Operation failed",
-            "DEBUG": "Debug info from {service}: Processing data"
-        }
-        return default_messages.get(log_type, f"[{log_type}] Log message from {service}")
-    
-    def _get_context_data(self, service: str) -> dict:
-        """Generate context data for message formatting based on service."""
-        base_context = {
-            'service': service,
-            'timestamp': int(time.time()),
-            'request_id': f"req-{random.randint(1000, 9999)}",
-            'user_id': f"user-{random.randint(1, 1000)}",
-            'ip_address': f"192.168.{random.randint(0, 255)}.{random.randint(0, 255)}"
-        }
+        if not templates:
+            templates = [DEFAULT_MESSAGES.get(log_type, f"[{log_type}] Log message from {service}")]
         
+        return tuple(_prepare_template(template) for template in templates)
+    
+    def _get_context_data(self, service: str, needed_keys: frozenset) -> dict:
+        """Generate the context fields in needed_keys for message formatting based on service.
+        
+        Fields the service can't provide are left out, so formatting a template
+        that needs them fails the same way it would with the full context.
+        """
         # Add service-specific context
         if 'auth' in service:
-            base_context.update({
-                'provider': random.choice(['google', 'github', 'email', 'microsoft']),
-                'session_id': f"sess-{random.getrandbits(64):016x}"
-            })
+            service_context = AUTH_CONTEXT
         elif 'payment' in service:
-            base_context.update({
-                'amount': f"{random.uniform(10, 1000):.2f}",
-                'currency': random.choice(['USD', 'EUR', 'GBP']),
-                'transaction_id': f"txn-{random.getrandbits(64):016x}"
-            })
-            
-        return base_context
+            service_context = PAYMENT_CONTEXT
+        else:
+            service_context = {}
+        
+        context: dict = {}
+        for key in needed_keys:
+            if key == 'service':
+                context[key] = service
+                continue
+            factory = service_context.get(key) or BASE_CONTEXT.get(key)
+            if factory is not None:
+                context[key] = factory()
+        return context
     
-    def generate_log_message(self) -> str:
-        """Generate a random log message based on configuration and service."""
+    def generate_log_message(self) -> tuple:
+        """Generate a random log message based on configuration and service.
+        
+        Returns:
+            The entry's components as (timestamp, log_type, log_id, service, message)
+        """
         # Select service and log type
         service: str = self._select_service()
         log_type: str = self._select_log_type()
         
         # Get message template and context
-        message_template = self._get_service_message(service, log_type)
-        context = self._get_context_data(service)
+        message_template, needed_keys, format_message = self._get_service_message(service, log_type)
+        context = self._get_context_data(service, needed_keys)
         
         # Format the message with context
         try:
-            message = message_template.format(**context)
+            message = format_message(context)
         except (KeyError, IndexError):
             # Fallback if formatting fails
             message = f"[{log_type}] {message_template} (formatting error)"
             
         # Generate a unique ID for this log entry
-        log_id: str = f"{service.upper()}-{int(time.time())}-{random.randint(1000, 9999)}"
-        timestamp: str = datetime.now().isoformat()
+        timestamp, now_sec = self._timestamp()
+        log_id: str = f"{service.upper()}-{now_sec}-{random.randint(1000, 9999)}"
         
-        # Create the full log entry with service context
-        log_entry: str = f"{timestamp} [{log_type}] [{log_id}] [{service}]: {message}"
-        return log_entry
+        return timestamp, log_type, log_id, service, message
+    
+    def _timestamp(self) -> tuple:
+        """Return the current local time as an ISO-8601 string with microseconds, and its epoch second.
+        
+        The `YYYY-MM-DDTHH:MM:SS` prefix only changes once a second, so it is cached
+        and only the microsecond suffix is formatted per call.
+        """
+        now_ns: int = time.time_ns()
+        now_sec: int = now_ns // 1_000_000_000
+        if now_sec != self._ts_sec_cached:
+            self._ts_sec_cached = now_sec
+            self._ts_prefix = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now_sec))
+        return f"{self._ts_prefix}.{(now_ns // 1000) % 1_000_000:06d}", now_sec
     
     def _select_log_type(self) -> str:
         """Select a log type based on the configured distribution."""
-        distribution: dict = self.config["LOG_DISTRIBUTION"]
-        types: list = list(distribution.keys())
-        weights: list = list(distribution.values())
+        if self._lvl_idx == len(self._lvl_buf):
+            # Weighted draw for a whole batch: bucket uniform samples by cumulative weight
+            picks = np.searchsorted(self._lvl_cum, self._rng.random(SAMPLE_BATCH_SIZE), side='right')
+            self._lvl_buf = self._lvl_names[picks].tolist()
+            self._lvl_idx = 0
         
-        return random.choices(types, weights=weights, k=1)[0]
+        log_type: str = self._lvl_buf[self._lvl_idx]
+        self._lvl_idx += 1
+        return log_type
     
     def _select_service(self) -> str:
         """Select a service based on the configured distribution."""
-        services: list = self.config["SERVICES"]
-        return random.choice(services)
+        if self._svc_idx == len(self._svc_buf):
+            picks = self._rng.integers(0, len(self._svc_names), SAMPLE_BATCH_SIZE)
+            self._svc_buf = self._svc_names[picks].tolist()
+            self._svc_idx = 0
+        
+        service: str = self._svc_buf[self._svc_idx]
+        self._svc_idx += 1
+        return service
     
     def _select_log_format(self) -> str:
         """Select a log format based on the configured distribution."""
         formats: list = self.config["LOG_FORMAT"]
         return random.choice(formats)
     
-    def _format_log_entry(self, log_entry: str, log_format: str) -> str:
-        """Format the log entry according to the specified format."""
+    @staticmethod
+    def _format_text(log_entry: tuple) -> str:
+        """Render log entry components as a single text log line."""
+        timestamp, log_type, log_id, service, message = log_entry
+        return f"{timestamp} [{log_type}] [{log_id}] [{service}]: {message}"
+    
+    def _format_log_entry(self, log_entry: tuple, log_format: str) -> list:
+        """Format the log entry according to the specified format.
+        
+        Returns:
+            The buffers making up the formatted line, to be written with writev
+        """
+        timestamp, log_type, log_id, service, message = log_entry
         if log_format == 'json':
-            # Split the log entry into components for JSON formatting
-            try:
-                timestamp, rest = log_entry.split(' [', 1)
-                log_level, rest = rest.split('] [', 1)
-                log_id, rest = rest.split('] [', 1)
-                service, message = rest.split(']: ', 1)
-                
-                log_data = {
-                    'timestamp': timestamp,
-                    'level': log_level,
-                    'id': log_id,
-                    'service': service,
-                    'message': message.rstrip('\n')
-                }
-                return json.dumps(log_data) + '\n'
-            except Exception as e:
-                # Fallback to text if parsing fails
-                return log_entry
+            log_data = {
+                'timestamp': timestamp,
+                'level': log_type,
+                'id': log_id,
+                'service': service,
+                'message': message
+            }
+            return [_json_dumps(log_data), _NL]
                 
         elif log_format == 'csv':
             # Simple CSV formatting - note: this may need escaping for complex messages
-            return f'"{log_entry.strip()}"\n'
-        # Default to text format
-        return log_entry + '\n'
+            return [f'"{self._format_text(log_entry)}"\n'.encode()]
+        # Default to text format: one buffer per line, as every extra iovec costs
+        # the kernel more than building the line here
+        return [f"{timestamp} [{log_type}] [{log_id}] [{service}]: {message}\n".encode()]
 
-    def write_log(self, log_entry: str, log_format: str) -> None:
+    def write_log(self, log_entry: tuple, log_format: str) -> None:
         """Write a log entry to the configured outputs in the specified format.
         
         Args:
-            log_entry: The log message to write
+            log_entry: The log entry components from generate_log_message
             log_format: The format to use ('txt', 'json', or 'csv')
         """
         # Format the log entry
-        formatted_entry = self._format_log_entry(log_entry, log_format)
+        formatted_entry: list = self._format_log_entry(log_entry, log_format)
         
         # Write to file if configured
         if self.config["OUTPUT_FILE"]:
-            # Add format extension if not already present
-            output_file = self.config["OUTPUT_FILE"]
-            if not any(output_file.endswith(ext) for ext in ['.txt', '.json', '.csv']):
-                output_file = f"{output_file}.{log_format}"
-                
-            with open(output_file, "a") as f:
-                f.write(formatted_entry)
+            if self._writer is None:
+                self._start_writer()
+            self._write_queue.put((self._get_output(log_format), formatted_entry))
         
         # Write to console if configured
         if self.config["CONSOLE_OUTPUT"]:
-            print(log_entry)
+            print(self._format_text(log_entry))
+    
+    def _get_output(self, log_format: str) -> int:
+        """Return the open file descriptor of the output file for the given format."""
+        # Add format extension if not already present
+        output_file = self.config["OUTPUT_FILE"]
+        if not any(output_file.endswith(ext) for ext in ['.txt', '.json', '.csv']):
+            output_file = f"{output_file}.{log_format}"
+        
+        fd = self._outputs.get(output_file)
+        if fd is None:
+            fd = self._outputs[output_file] = os.open(output_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        return fd
+    
+    def _start_writer(self) -> None:
+        """Start the background thread that writes queued entries to disk.
+        
+        close() is registered to run at exit, so entries queued by callers that
+        never call it themselves are still written.
+        """
+        self._writer = threading.Thread(target=self._writer_loop, name="log-writer", daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+    
+    def _writer_loop(self) -> None:
+        """Drain the write queue, gathering up to WRITE_BATCH_SIZE entries per syscall.
+        
+        Blocks until an entry is available, then takes whatever else is already
+        queued, so a quiet generator writes each entry straight away while a
+        bursting one coalesces many small writes into one writev per file.
+        """
+        stopping = False
+        while not stopping:
+            item = self._write_queue.get()
+            if item is None:
+                break
+            batch: list = [item]
+            while len(batch) < WRITE_BATCH_SIZE:
+                try:
+                    item = self._write_queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+            self._write_batch(batch)
+    
+    def _write_batch(self, batch: list) -> None:
+        """Write a batch of (fd, buffers) entries with one writev per run of the same file."""
+        start = 0
+        while start < len(batch):
+            fd = batch[start][0]
+            end = start + 1
+            while end < len(batch) and batch[end][0] == fd:
+                end += 1
+            buffers = [data for _, pieces in batch[start:end] for data in pieces]
+            try:
+                written = os.writev(fd, buffers)
+                # Regular files normally take everything; finish any short write
+                remaining = b"".join(buffers)[written:] if written < sum(map(len, buffers)) else b""
+                while remaining:
+                    remaining = remaining[os.write(fd, remaining):]
+            except OSError as e:
+                print(f"Error writing logs: {e}", file=sys.stderr)
+            start = end
+    
+    def close(self) -> None:
+        """Wait for queued entries to be written, then close all output files."""
+        if self._writer is not None:
+            self._write_queue.put(None)
+            self._writer.join()
+            self._writer = None
+            atexit.unregister(self.close)
+        for fd in self._outputs.values():
+            os.close(fd)
+        self._outputs.clear()
     
-    def _should_start_burst(self, last_burst_time: float, burst_frequency: int) -> bool:
-        """Determine if a burst should start based on the configured frequency."""
-        if not self.config["ENABLE_BURSTS"]:
-            return False
-            
-        time_since_last_burst = time.time() - last_burst_time
-        # Using poisson distribution to make bursts more natural
-        burst_probability = 1.0 / (burst_frequency * 60)  # Convert minutes to probability per second
-        return (random.random() < burst_probability) or (time_since_last_burst > burst_frequency * 60)
-
     def run(self, duration: float | None = None) -> None:
         """Run the log generator for a specified duration or indefinitely.
         
@@ -180,47 +412,70 @@ class LogGenerator:
             print(f"Burst mode enabled: x{self.config['BURST_MULTIPLIER']} rate "
                   f"for {self.config['BURST_DURATION']}s every ~{self.config['BURST_FREQUENCY']} minutes")
         
-        # Calculate base sleep time based on log rate
-        base_sleep_time: float = 1.0 / self.config["LOG_RATE"] if self.config["LOG_RATE"] > 0 else 1.0
-        sleep_time = base_sleep_time
+        # Calculate base interval between logs, in nanoseconds, based on log rate
+        base_sleep_ns: int = 1_000_000_000 // self.config["LOG_RATE"] if self.config["LOG_RATE"] > 0 else 1_000_000_000
+        sleep_ns: int = base_sleep_ns
+        
+        start_ns: int = time.monotonic_ns()
+        end_ns: int | None = start_ns + int(duration * 1e9) if duration is not None else None
         
         # Burst state tracking
+        bursts_enabled: bool = bool(self.config["ENABLE_BURSTS"])
+        burst_prob: float = self._burst_prob if bursts_enabled else 0.0
+        burst_window_ns: int = int(self._burst_window_s * 1e9) if bursts_enabled else 0
+        burst_duration_ns: int = self.config["BURST_DURATION"] * 1_000_000_000
         is_bursting = False
-        burst_start_time = 0
-        last_burst_time = 0
+        burst_start_ns = 0
+        # Start out overdue for a burst, as the wall-clock version did
+        last_burst_ns = start_ns - burst_window_ns - 1
         
-        start_time: float = time.time()
         count: int = 0
         log_format: str = self._select_log_format()
         
+        # Pace against absolute deadlines so time spent generating and writing
+        # each entry comes out of the sleep instead of adding to it
+        next_deadline_ns: int = start_ns + sleep_ns
+        
         try:
-            while duration is None or time.time() - start_time < duration:
-                current_time = time.time()
+            while True:
+                current_ns = time.monotonic_ns()
+                if end_ns is not None and current_ns >= end_ns:
+                    break
                 
-                # Check if we should start a burst
-                if (not is_bursting and 
-                    self._should_start_burst(last_burst_time, self.config["BURST_FREQUENCY"])):
+                # Check if we should start a burst, using poisson distribution to make bursts more natural
+                if (bursts_enabled and not is_bursting and
+                        (random.random() < burst_prob or current_ns - last_burst_ns > burst_window_ns)):
                     is_bursting = True
-                    burst_start_time = current_time
-                    sleep_time = base_sleep_time / self.config["BURST_MULTIPLIER"]
+                    burst_start_ns = current_ns
+                    sleep_ns = base_sleep_ns // self.config["BURST_MULTIPLIER"]
+                    next_deadline_ns = current_ns + sleep_ns
                     print(f"\n Burst Mode Activated! Generating {self.config['BURST_MULTIPLIER']}x logs for {self.config['BURST_DURATION']}s")
                 
                 # Check if burst should end
-                if is_bursting and (current_time - burst_start_time) >= self.config["BURST_DURATION"]:
+                if is_bursting and (current_ns - burst_start_ns) >= burst_duration_ns:
                     is_bursting = False
-                    sleep_time = base_sleep_time
-                    last_burst_time = current_time
+                    sleep_ns = base_sleep_ns
+                    last_burst_ns = current_ns
+                    next_deadline_ns = current_ns + sleep_ns
                     print(f"Burst Mode Deactivated. Resuming normal rate.\n")
                 
                 # Generate and write log
-                log_entry: str = self.generate_log_message()
+                log_entry: tuple = self.generate_log_message()
                 self.write_log(log_entry, log_format)
                 count += 1
                 
-                # Sleep to maintain the configured rate
-                time.sleep(sleep_time)
+                # Sleep until the next deadline to maintain the configured rate
+                delta_ns = next_deadline_ns - time.monotonic_ns()
+                if delta_ns > 0:
+                    time.sleep(delta_ns / 1e9)
+                elif delta_ns < -1_000_000_000:
+                    # Fell more than a second behind (e.g. process was suspended); don't try to catch up
+                    next_deadline_ns -= delta_ns
+                next_deadline_ns += sleep_ns
                 
         except KeyboardInterrupt:
             print("\nLog generator stopped by user")
+        finally:
+            self.close()
         
         print(f"Generated {count} log entries")
\ No newline at end of file
@@ -0,0 +1,103 @@
+"""
+Tests for the log generator's compiled message templates.
+"""
+import pytest
+
+from config import DEFAULT_CONFIG
+from log_generator import DEFAULT_MESSAGES, _compile_template
+
+CONTEXT: dict = {
+    'service': 'auth-service',
+    'user_id': 'user-42',
+    'amount': 12.5,
+    'count': 7,
+    'width': 12,
+    'items': ['a', 'b'],
+    'text': 'it\'s "quoted" \\ done',
+    # Fields the shipped templates refer to
+    'timestamp': 1760500000,
+    'request_id': 'req-1234',
+    'ip_address': '192.168.0.1',
+    'provider': 'github',
+    'session_id': 'sess-00ff',
+    'currency': 'EUR',
+    'transaction_id': 'txn-00ff',
+}
+
+TEMPLATES: list = [
+    # Plain fields and literals
+    "Operation completed successfully in {service}",
+    "no fields at all",
+    "",
+    "{service}{user_id}",
+    # Escaped braces
+    "{{literal}} {service} {{{service}}}",
+    "}} {{",
+    # Conversions
+    "{text!r} {service!s} {text!a}",
+    "{service!r:>30}",
+    # Format specs, including nested ones
+    "{amount:.2f} {count:05d} {service:^20}",
+    "{service:>{width}}",
+    "{amount:{width}.{count}f}",
+    "{count:,} {amount:e} {count:#x}",
+    # Quotes and backslashes in the literal text and in the values
+    "it's {service}",
+    "{service} ends with a quote'",
+    'It\'s "{service}"',
+    'trailing quote "',
+    '"""{service}"""',
+    "back\\slash {service} \\n",
+    "line\nbreak {service}\ttab",
+    "unicode é日 {service} \U0001f600",
+    # Attribute, index and positional fields
+    "{items[0]} {items[1]}",
+    "{amount.real}",
+    "{0}",
+    "{}",
+    # Fields the context can't provide
+    "{missing}",
+    "{service} {missing}",
+    "{items[5]}",
+    "{amount.nope}",
+    # Malformed templates and invalid specs / conversions
+    "{",
+    "}",
+    "{service",
+    "{service!x}",
+    "{service:d}",
+    "{count:{missing}}",
+]
+# Every template the service ships with
+TEMPLATES += [
+    template
+    for messages in DEFAULT_CONFIG['SERVICE_MESSAGES'].values()
+    for templates in messages.values()
+    for template in templates
+]
+
+
+def _outcome(func) -> tuple:
+    """Return ('ok', result) or ('raises', exception type) for calling func."""
+    try:
+        return 'ok', func()
+    except Exception as e:
+        return 'raises', type(e)
+
+
+@pytest.mark.parametrize('template', TEMPLATES)
+def test_compiled_template_matches_str_format(template: str) -> None:
+    expected = _outcome(lambda: template.format(**CONTEXT))
+    actual = _outcome(lambda: _compile_template(template)(CONTEXT))
+    assert actual == expected
+
+
+@pytest.mark.parametrize('template', DEFAULT_MESSAGES.values())
+def test_plain_templates_are_compiled(template: str) -> None:
+    # Only templates the f-string rewrite can't express fall back to str.format
+    assert _compile_template(template).__name__ == '<lambda>'
+
+
+def test_compiled_template_does_not_expose_builtins() -> None:
+    # Field names go through the context dict, never through eval'd names
+    assert _outcome(lambda: _compile_template("{__import__}")({})) == ('raises', KeyError)